@@ -1,17 +1,34 @@
 #!/usr/bin/env python3
 
 import argparse
+import copy
+import hashlib
+import io
+import json
 import os
+import queue
 import re
+import shutil
+import stat
 import sys
+import threading
 
 BACKUP_ONLY = "backup"
 
 import subprocess
 
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
+from pathlib import Path
 from subprocess import Popen, PIPE, STDOUT
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+try:
+  import psutil
+except ImportError:
+  psutil = None
 
 os.environ['PATH'] = os.environ['PATH'] + ':' + os.environ['HOME'] + '/bin'
 
@@ -36,6 +53,20 @@ syncdirs: Dict[str, Dict[str, Any]] = {
   "test": { "local": f"{home}/tmp/gdtest", "remote": f"{gdrive}:{thishost}/test", BACKUP_ONLY: True },
 }
 
+@dataclass(frozen=True, slots=True)
+class DirConf:
+  name: str
+  local: str
+  remote: str
+  repo: str  # rclone remote name, e.g. "gdrive"
+  backup_only: bool
+
+
+SYNCDIRS: Dict[str, DirConf] = {
+  name: DirConf(name, v["local"], v["remote"], v["remote"].split(":", 1)[0], v.get(BACKUP_ONLY, False))
+  for name, v in syncdirs.items()
+}
+
 modes: Dict[str, List[str]] = {
   "volatile": [ "bin", "local_dots", "shared_dots", "vault" ],
   "files": [ "notes", "jobsearch", "misc", "learning", "records", "tips-howtos" ],
@@ -44,131 +75,282 @@ modes: Dict[str, List[str]] = {
   "macos": [ "bin", "local_dots", "localsrc", "shared_dots", "sharedsrc" ],
 }
 
+# max number of sync dirs run concurrently
+MAX_SYNC_WORKERS: int = 4
+
+# max number of threads doing local stat()/unlink() calls (both release the GIL)
+MAX_FS_WORKERS: int = 16
+
+# relpath -> [size, mtime, blake2b digest] of each local file as of the last sync
+SyncCache = Dict[str, List[Any]]
+
+# read buffer for rclone output pipes
+PIPE_BUFSIZE: int = 1 << 16
+
+# serializes terminal output and interactive prompts across sync workers
+term_lock = threading.Lock()
+
+# set when a sync dir fails or the user quits: running workers stop at the next phase
+stop_syncing = threading.Event()
+
+# prompts queued by sync workers; run() answers them on the main thread so
+# that Ctrl-C at a prompt interrupts input() directly
+prompt_queue: "queue.Queue[Tuple[Callable[[], bool], Future]]" = queue.Queue()
+
 def datestr() -> str:
   now = datetime.now()
-  ampm = "am" if now.hour < 12 else "pm"
-  hour = 12 if now.hour == 12 else now.hour % 12
-  ms: str = str(now.microsecond // 1000).rjust(3, '0')
-  return f"{hour:02}:{now.minute:02}:{now.second:02}.{ms} {ampm}"
+  return f"{now.strftime('%I:%M:%S')}.{now.microsecond // 1000:03d} {'am' if now.hour < 12 else 'pm'}"
 
 
-def log(msg: str, nonl: bool = False) -> None:
+def log(msg: str, nonl: bool = False, out: Optional[TextIO] = None) -> None:
   end: str = "" if nonl else "\n"
-  print(f"{datestr()}: {msg}", end=end, flush=True)
+  print(f"{datestr()}: {msg}", end=end, file=out, flush=True)
+
 
+# stderr is left going to the terminal
+def runcmd(cmd: List[str]) -> Tuple[int, str]:
+  res = subprocess.run(cmd, stdout=PIPE, check=False, text=True, encoding="utf-8", errors="replace")
+  return res.returncode, res.stdout
 
-def runcmd(cmd: List[str]) -> Tuple[int, str, str]:
-  proc = Popen(cmd, stdout=PIPE)
-  (output, errout) = proc.communicate()
-  exit_code = proc.wait()
-  out: str = output.decode("utf-8") if output is not None else ""
-  err: str = errout.decode("utf-8") if errout is not None else ""
-  return exit_code, out, err
+_ENV_RE: re.Pattern = re.compile(r"([A-Z0-9_]+)\s*=\s*(.+)")
 
 def set_envs():
-  ec, out, _ = runcmd(["cat", f"{os.environ['HOME']}/.env"])
-  for sline in out.split("\n"):
-    if len(sline) > 0:
-      name, val = re.search("([A-Z0-9_]+)\s*=\s*(.+)", sline).groups()
-      val = val.replace("$HOME", os.environ['HOME'])
+  try:
+    text: str = Path(home, ".env").read_text()
+  except FileNotFoundError:
+    return
+  for sline in text.splitlines():
+    m = _ENV_RE.search(sline)
+    if m:
+      name, val = m.groups()
+      val = val.replace("$HOME", home)
       #if sys.stdout.isatty():
       #  print(f"setting env var {name}={val}", flush=True)
       os.environ[name] = val
 
 
+# rclone output lines not worth showing
+ignored_patterns: List[str] = [
+  "There was nothing to transfer",
+  "Cryptomator/ipc.socket",
+  "matching files",
+  r"INFO\s*:\s*$",
+  r"^Elapsed time:",
+  r"^\s$",
+]
+
+# additional lines hidden from rclone check output
+ignored_check_patterns: List[str] = [
+  "errors while checking",
+  r"INFO\s*:\s*$",
+  r"^Transferred:",
+  r"^Errors:",
+  r"^Checks:",
+  r"files? missing$",
+  r"differences found$",
+  r"sizes differ",
+  r"ERROR\s*:.*file not in",
+  r"ERROR\s*:.*MD5 differ",
+  r"Using md5 for hash comparisons",
+]
+
+
+def compile_any(patterns: List[str]) -> re.Pattern:
+  return re.compile("|".join(f"(?:{p})" for p in patterns), flags=re.IGNORECASE)
+
+
+_IGNORE_ALL: re.Pattern = compile_any(ignored_patterns)
+_IGNORE_CHECK: re.Pattern = compile_any(ignored_check_patterns)
+
+
+# highlight deletes rclone skipped (e.g. because of --dryrun or errors)
+_SKIPPED_DELETE_RE: re.Pattern = re.compile(r"skipped delete", flags=re.IGNORECASE)
+_SKIPPED_DELETE_REPL: str = "\x1b[1;31mSKIPPED DELETE\x1b[m"
+
+
+# rclone stats lines: hidden from check output, shown otherwise
+_STATS_PREFIXES: Tuple[str, ...] = ("Transferred:", "Checks:", "Errors:")
+
+
 def is_ignored_line(txt: str, mode: str = "") -> bool:
-  for ignored in [
-    "There was nothing to transfer",
-    "Cryptomator/ipc.socket",
-    "matching files",
-    r"INFO\s*:\s*$",
-    r"^Elapsed time:",
-    r"^\s$",
-  ]:
-    if re.search(ignored, txt, flags=re.IGNORECASE):
-      return True
+  # cheap prefix tests first; most lines never reach the regexes
+  if not txt or txt.isspace():
+    return True
+  if txt.startswith("Elapsed time:"):
+    return True
+  if txt.startswith(_STATS_PREFIXES):
+    return mode == "check"
 
-  if mode == "check":
-    for ignored in [
-      "errors while checking",
-      r"INFO\s*:\s*$",
-      r"^Transferred:",
-      r"^Errors:",
-      r"^Checks:",
-      r"files? missing$",
-      r"differences found$",
-      r"sizes differ",
-      r"ERROR\s*:.*file not in",
-      r"ERROR\s*:.*MD5 differ",
-      r"Using md5 for hash comparisons",
-    ]:
-      if re.search(ignored, txt, flags=re.IGNORECASE):
-        return True
+  return bool(_IGNORE_ALL.search(txt)) or (mode == "check" and bool(_IGNORE_CHECK.search(txt)))
+
+
+# run cmd with its stdout+stderr decoded in large blocks rather than line by line
+def popen_text(cmd: List[str]) -> Popen:
+  return Popen(
+    cmd, stdout=PIPE, stderr=STDOUT, bufsize=PIPE_BUFSIZE, text=True, encoding="utf-8", errors="replace"
+  )
 
-  return False
+
+class RcloneTuning:
+  def __init__(self, transfers: int, checkers: int, buffer_size: str, drive_chunk_size: str):
+    self.transfers = transfers
+    self.checkers = checkers
+    self.buffer_size = buffer_size
+    self.drive_chunk_size = drive_chunk_size
 
 
 class RunConfig:
-  def __init__(self, dryrun: bool, sync: bool, verbose: bool):
+  def __init__(
+    self,
+    dryrun: bool,
+    sync: bool,
+    verbose: bool,
+    tuning: Optional[RcloneTuning] = None,
+    out: Optional[TextIO] = None,
+  ):
     self.dryrun = dryrun
     self.sync = sync
     self.verbose = verbose
+    # extra rclone concurrency flags; None means use rclone's defaults
+    self.tuning = tuning
+    # where progress output is written; None means stdout
+    self.out = out
+
+
+def flush_output(cfg: RunConfig) -> None:
+  with term_lock:
+    write_buffered_output(cfg)
+
+
+# caller must hold term_lock
+def write_buffered_output(cfg: RunConfig) -> None:
+  if isinstance(cfg.out, io.StringIO):
+    sys.stdout.write(cfg.out.getvalue())
+    sys.stdout.flush()
+    cfg.out.seek(0)
+    cfg.out.truncate()
+
+
+# called from a sync worker: run fn on the main thread and return its result,
+# or False if syncing is being stopped before it gets answered
+def on_main_thread(fn: Callable[[], bool]) -> bool:
+  reply: Future = Future()
+  prompt_queue.put((fn, reply))
+  while len(wait([reply], timeout=0.1).done) == 0:
+    if stop_syncing.is_set():
+      return False
+  return reply.result()
+
+
+# called from the main thread: run one queued prompt, if any arrives in time
+def run_queued_prompt(timeout: float) -> None:
+  try:
+    fn, reply = prompt_queue.get(timeout=timeout)
+  except queue.Empty:
+    return
+  try:
+    reply.set_result(fn())
+  except BaseException as e:
+    reply.set_exception(e)
+    raise
+
+
+# grab the terminal for prompting the user: flush what the worker has
+# buffered so far and write straight to stdout until done
+@contextmanager
+def interactive(cfg: RunConfig) -> Iterator[None]:
+  with term_lock:
+    write_buffered_output(cfg)
+    buffered: Optional[TextIO] = cfg.out
+    cfg.out = None
+    try:
+      yield
+    finally:
+      cfg.out = buffered
 
 
 # return value indicates whether to proceed with sync
-def check_for_files_not_on_both(local: str, remote: str, cfg: RunConfig, tstamp_file: str) -> bool:
-  only_remote_file: str = f"{os.environ['HOME']}/tmp/onlyremote.txt"
-  only_local_file: str = f"{os.environ['HOME']}/tmp/onlylocal.txt"
+def check_for_files_not_on_both(
+  name: str,
+  local: str,
+  remote: str,
+  cfg: RunConfig,
+  synctime: Optional[float]
+) -> bool:
+  only_remote_file: str = f"{os.environ['HOME']}/tmp/onlyremote.{name}.txt"
+  only_local_file: str = f"{os.environ['HOME']}/tmp/onlylocal.{name}.txt"
   cmd: List[str] = f"rclone check --missing-on-dst {only_local_file} --missing-on-src {only_remote_file} {local} {remote}".split(" ")
+  if cfg.tuning is not None:
+    cmd[2:2] = [f"--checkers={cfg.tuning.checkers}", "--fast-list"]
   if cfg.verbose:
-    print(f"rclone cmd: {' '.join(cmd)}", flush=True)
-  with Popen(cmd, stdout=PIPE, stderr=STDOUT) as proc:
+    print(f"rclone cmd: {' '.join(cmd)}", file=cfg.out, flush=True)
+  with popen_text(cmd) as proc:
     assert proc.stdout is not None
-    for b in proc.stdout:
-      s = b.decode("utf-8")
+    for s in proc.stdout:
       if not is_ignored_line(s, "check"):
-        print(s, end="", flush=True)
+        print(s, end="", file=cfg.out, flush=True)
 
-  if not handle_only_local_files(local, remote, only_local_file, tstamp_file, cfg):
-    return False
+  # classify before taking the terminal: stats and hashing can be slow
+  oldfiles: List[str] = find_old_local_files(local, only_local_file, synctime, load_sync_cache(name))
 
-  return handle_only_remote_files(local, remote, only_remote_file, cfg)
+  return on_main_thread(lambda: resolve_conflicts(local, remote, oldfiles, only_remote_file, cfg))
 
 
-# return value indicates whether to proceed with sync
-def handle_only_local_files(
+# runs on the main thread; return value indicates whether to proceed with sync
+def resolve_conflicts(
   local: str,
   remote: str,
-  only_local_file: str,
-  tstamp_file: str,
+  oldfiles: List[str],
+  only_remote_file: str,
   cfg: RunConfig
 ) -> bool:
-  if not os.path.exists(only_local_file) or os.path.getsize(only_local_file) == 0:
-    os.remove(only_local_file)
-    return True
+  with interactive(cfg):
+    if stop_syncing.is_set():
+      return False
+    if not handle_only_local_files(local, remote, oldfiles, cfg):
+      return False
+
+    return handle_only_remote_files(local, remote, only_remote_file, cfg)
 
-  # check if any files are older than last time sync was run
-  oldfiles: List[str] = []
-  if os.path.isfile(tstamp_file):
-    synctime = os.stat(tstamp_file).st_mtime
-    with open(only_local_file, "r") as loc:
-      for fname in loc:
-        fname = fname.strip()
-        ftime = os.stat(f"{local}/{fname}").st_mtime
-        if ftime < synctime:
-          oldfiles.append(fname)
+
+# only-local files that were already here last time sync was run
+def find_old_local_files(
+  local: str,
+  only_local_file: str,
+  synctime: Optional[float],
+  cache: Optional[SyncCache]
+) -> List[str]:
+  if not os.path.exists(only_local_file):
+    return []
+  # a dir that has never been synced can't have files deleted elsewhere
+  if synctime is None or os.path.getsize(only_local_file) == 0:
     os.remove(only_local_file)
+    return []
+
+  fnames: List[str] = [
+    fname.strip() for fname in Path(only_local_file).read_text().splitlines() if fname.strip()
+  ]
+  os.remove(only_local_file)
+  return [
+    fname for fname, st in zip(fnames, local_stats(local, fnames))
+    if was_synced(local, fname, st, synctime, cache)
+  ]
+
 
+# return value indicates whether to proceed with sync
+def handle_only_local_files(local: str, remote: str, oldfiles: List[str], cfg: RunConfig) -> bool:
   if len(oldfiles) == 0:
     return True
 
   # ask user what to do
-  print("the following files are only on local and are older than the last sync", flush=True)
+  print("the following files are only on local and were already here at the last sync", flush=True)
   print("likely they have been purposefully deleted on another host:", flush=True)
   print("  " + "\n  ".join(oldfiles), flush=True)
   rsp: str = "halbrand is sauron"
   while rsp.lower() not in [ "y", "n", "a", "q", "" ]:
     rsp = input("\nRemove these local files before proceeding? (Y/n/a[bort]): ")
+  if stop_syncing.is_set():
+    return False
 
   should_continue: bool = False
   match rsp.lower():
@@ -183,7 +365,7 @@ def handle_only_local_files(
       if cfg.dryrun:
         print("not removing files because --dryrun was passed", flush=True)
       else:
-        subprocess.run(["/bin/rm", "-rfdv"] + oldfiles, cwd=local)
+        remove_local_paths(local, oldfiles)
         rm_empty_folders(local, oldfiles)
         input("\nHit return to continue: ")
       should_continue = True
@@ -195,19 +377,140 @@ def handle_only_local_files(
   return should_continue
 
 
+def local_stats(local: str, fnames: List[str]) -> List[os.stat_result]:
+  def lstat(fname: str) -> os.stat_result:
+    return os.stat(f"{local}/{fname}", follow_symlinks=False)
+
+  with ThreadPoolExecutor(max_workers=MAX_FS_WORKERS) as pool:
+    return list(pool.map(lstat, fnames))
+
+
+# whether an only-local file existed, unchanged, at the last sync - i.e. it
+# was most likely deleted on another host rather than being new here
+def was_synced(
+  local: str,
+  fname: str,
+  st: os.stat_result,
+  synctime: float,
+  cache: Optional[SyncCache]
+) -> bool:
+  if cache is None:
+    # no record of the last sync, so go by age
+    return st.st_mtime < synctime
+
+  entry: Optional[List[Any]] = cache.get(fname)
+  if entry is None:
+    return False
+  size, mtime, digest = entry
+  if st.st_size != size:
+    return False
+  if st.st_mtime == mtime:
+    return True
+  # touched but maybe not modified
+  try:
+    return file_digest(f"{local}/{fname}") == digest
+  except OSError:
+    return False  # can't prove it's unchanged, so don't offer to remove it
+
+
+def file_digest(path: str) -> str:
+  h = hashlib.blake2b(digest_size=8)
+  with open(path, "rb") as f:
+    for chunk in iter(lambda: f.read(1 << 20), b""):
+      h.update(chunk)
+  return h.hexdigest()
+
+
+def sync_cache_file(name: str) -> str:
+  return f"{os.environ['HOME']}/tmp/var/gdsync.{name}.cache.json"
+
+
+def load_sync_cache(name: str) -> Optional[SyncCache]:
+  try:
+    with open(sync_cache_file(name), "r") as f:
+      return json.load(f)
+  except (FileNotFoundError, json.JSONDecodeError):
+    return None
+
+
+# record size/mtime/digest of every local file; only new or changed files get hashed
+def update_sync_cache(name: str, local: str) -> None:
+  old: SyncCache = load_sync_cache(name) or {}
+  cache: SyncCache = {}
+  tohash: List[Tuple[str, os.stat_result]] = []
+  for dirpath, _, filenames in os.walk(local):
+    for fname in filenames:
+      fullpath: str = os.path.join(dirpath, fname)
+      try:
+        st: os.stat_result = os.stat(fullpath, follow_symlinks=False)
+      except FileNotFoundError:
+        continue
+      if not stat.S_ISREG(st.st_mode):
+        continue
+      relpath: str = os.path.relpath(fullpath, local)
+      entry: Optional[List[Any]] = old.get(relpath)
+      if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime:
+        cache[relpath] = entry
+      else:
+        tohash.append((relpath, st))
+
+  # None for files that can't be read (or vanished); those are left out of the cache
+  def digest_or_none(relpath: str) -> Optional[str]:
+    try:
+      return file_digest(f"{local}/{relpath}")
+    except OSError:
+      return None
+
+  with ThreadPoolExecutor(max_workers=MAX_FS_WORKERS) as pool:
+    digests = pool.map(digest_or_none, [relpath for relpath, _ in tohash])
+    for (relpath, st), digest in zip(tohash, digests):
+      if digest is not None:
+        cache[relpath] = [st.st_size, st.st_mtime, digest]
+
+  cache_file: str = sync_cache_file(name)
+  with open(f"{cache_file}.tmp", "w") as f:
+    json.dump(cache, f)
+  os.replace(f"{cache_file}.tmp", cache_file)
+
+
+# like rm -rfv, but without passing every path through one huge argv
+def remove_local_paths(local: str, paths: List[str]) -> None:
+  def remove(path: str) -> str:
+    fullpath: str = f"{local}/{path}"
+    try:
+      if os.path.isdir(fullpath) and not os.path.islink(fullpath):
+        shutil.rmtree(fullpath)
+        return f"removed directory '{path}'"
+      os.remove(fullpath)
+      return f"removed '{path}'"
+    except FileNotFoundError:
+      return ""
+    except OSError as e:
+      return f"cannot remove '{path}': {e.strerror}"
+
+  with ThreadPoolExecutor(max_workers=MAX_FS_WORKERS) as pool:
+    for msg in pool.map(remove, paths):
+      if msg:
+        print(msg, flush=True)
+
+
+def is_empty_dir(path: str) -> bool:
+  with os.scandir(path) as entries:
+    return next(entries, None) is None
+
+
 def rm_empty_folders(local: str, oldfiles: List[str]) -> None:
   dirs: Set[str] = set()
   for f in oldfiles:
     while "/" in f:
-      d = re.search("(.+)/[^/]+", f).group(1)
-      dirs.add(d)
-      f = d
+      f = f.rsplit("/", 1)[0]
+      dirs.add(f)
 
   if len(dirs) > 0:
     ordered: List[str] = sorted(list(dirs), key=len, reverse=True)
     for d in ordered:
       fullpath: str = f"{local}/{d}"
-      if len(os.listdir(fullpath)) == 0:
+      if is_empty_dir(fullpath):
         print(f"removing empty dir {d}")
         os.rmdir(fullpath)
 
@@ -224,6 +527,8 @@ def handle_only_remote_files(local: str, remote: str, only_remote_file: str, cfg
   rsp: str = "halbrand is sauron"
   while rsp.lower() not in [ "y", "n", "q", "c", "" ]:
     rsp = input("\nProceed with sync? switch to copy if you don't want to delete these files (y/n/C): ")
+  if stop_syncing.is_set():
+    return False
 
   should_continue: bool
   match rsp.lower():
@@ -247,53 +552,174 @@ def handle_only_remote_files(local: str, remote: str, only_remote_file: str, cfg
   return should_continue
 
 
+def rclone_tuning_flags(remote: str, cfg: RunConfig) -> List[str]:
+  if cfg.tuning is None:
+    return []
+
+  flags: List[str] = [
+    f"--transfers={cfg.tuning.transfers}",
+    f"--checkers={cfg.tuning.checkers}",
+    "--fast-list",
+    f"--buffer-size={cfg.tuning.buffer_size}",
+  ]
+  if remote.startswith(f"{gdrive}:"):
+    flags += [
+      f"--drive-chunk-size={cfg.tuning.drive_chunk_size}",
+      "--drive-pacer-min-sleep=10ms",
+    ]
+  return flags
+
+
 def run_rclone(src: str, dest: str, upload: bool, cfg: RunConfig):
   copy_cmd = "sync" if cfg.sync and upload else "copy"
-  rclone_cmd = f"rclone {copy_cmd} -u {'--delete-excluded ' if upload else ''}{src} {dest}"
+  cmd: List[str] = (
+    ["rclone", copy_cmd, "-u"]
+    + rclone_tuning_flags(dest if upload else src, cfg)
+    + (["--delete-excluded"] if upload else [])
+    + [src, dest]
+  )
   if cfg.verbose:
-    print(f"rclone cmd: {rclone_cmd}", flush=True)
+    print(f"rclone cmd: {' '.join(cmd)}", file=cfg.out, flush=True)
   if cfg.dryrun:
-    rclone_cmd = rclone_cmd.replace("-u", "-un")
-  cmd: List[str] = ["bash", "-c", f"stdbuf -o0 -e0 {rclone_cmd}"]
+    cmd[2] = "-un"
 
   printed: bool = False
-  with Popen(cmd, stdout=PIPE, stderr=STDOUT) as proc:
+  with popen_text(cmd) as proc:
     assert proc.stdout is not None
-    for b in proc.stdout:
-      s = b.decode("utf-8")
+    for s in proc.stdout:
       if not is_ignored_line(s):
         if not printed:
           print(
               f"copying \x1b[1;{'32mup to' if upload else '34mdown from'} "
               f"{dest if upload else src}\x1b[m",
+              file=cfg.out,
               flush=True
           )
           printed = True
-        s = re.sub("skipped delete", "\x1b[1;31mSKIPPED DELETE\x1b[m", s, flags=re.IGNORECASE)
-        print(s, end="", flush=True)
+        if "skipped" in s.lower():
+          s = _SKIPPED_DELETE_RE.sub(_SKIPPED_DELETE_REPL, s)
+        print(s, end="", file=cfg.out, flush=True)
+
+
+# (pid, ppid, command line) of every running process, or None if they can't
+# be listed without shelling out to ps
+def running_cmdlines() -> Optional[List[Tuple[int, int, str]]]:
+  if os.path.isdir("/proc"):
+    procs: List[Tuple[int, int, str]] = []
+    with os.scandir("/proc") as entries:
+      for entry in entries:
+        if not entry.name.isdigit():
+          continue
+        try:
+          with open(f"/proc/{entry.name}/cmdline", "rb") as f:
+            raw: bytes = f.read()
+          with open(f"/proc/{entry.name}/stat", "rb") as f:
+            procstat: bytes = f.read()
+        except OSError:
+          continue  # process went away
+        # comm (field 2) may contain spaces and parens: ppid is the 2nd field after it
+        ppid: int = int(procstat[procstat.rindex(b")") + 1:].split()[1])
+        cmdline: str = raw.rstrip(b"\0").replace(b"\0", b" ").decode("utf-8", "replace")
+        procs.append((int(entry.name), ppid, cmdline))
+    return procs
+
+  if psutil is not None:
+    return [
+      (proc.info["pid"], proc.info["ppid"], " ".join(proc.info["cmdline"] or []))
+      for proc in psutil.process_iter(["pid", "ppid", "cmdline"])
+    ]
+
+  return None
 
 
 def is_already_running(modes: List[str], dirs: List[str]) -> bool:
   pid: int = os.getpid()
   ppid: int = os.getppid()
-  srch_args = '|'.join(modes if len(modes) > 0 else dirs)
-  grepstr: str = f"[g]dsync.*({srch_args})"
-  ecode, stdout, stderr = runcmd(
-    ["bash", "-c", f"ps -eaf | grep -vEw '{pid}|{ppid}|tail -F' | grep -iE '{grepstr}'"]
-  )
-  if ecode == 0 or len(stdout) > 0:
-    print(stdout, flush=True)
+  procs: Optional[List[Tuple[int, int, str]]] = running_cmdlines()
+  if procs is None:
+    srch_args = '|'.join(modes if len(modes) > 0 else dirs)
+    grepstr: str = f"[g]dsync.*({srch_args})"
+    ecode, stdout = runcmd(
+      ["bash", "-c", f"ps -eaf | grep -vEw '{pid}|{ppid}|tail -F' | grep -iE '{grepstr}'"]
+    )
+    if ecode == 0 or len(stdout) > 0:
+      print(stdout, flush=True)
+      return True
+
+    return False
+
+  srch_args = '|'.join(map(re.escape, modes if len(modes) > 0 else dirs))
+  srch: re.Pattern = re.compile(f"gdsync.*({srch_args})", flags=re.IGNORECASE)
+  # like the old grep -vw on ps output: skip us, our parent, and children of either
+  # (e.g. a sibling `tee gdsync.<mode>.log` in the same pipeline)
+  running: List[str] = [
+    f"{p} {cmdline}" for p, pp, cmdline in procs
+    if p not in (pid, ppid) and pp not in (pid, ppid)
+    and "tail -F" not in cmdline and srch.search(cmdline)
+  ]
+  if len(running) > 0:
+    print("\n".join(running), flush=True)
     return True
 
   return False
 
 
 # return True means proceed with sync
-def conflicts_check_is_ok(dirconf: Dict[str, str], cfg: RunConfig, tstamp_file: str) -> bool:
-  if BACKUP_ONLY in dirconf or not cfg.sync: # or cfg.dryrun:
+def conflicts_check_is_ok(dirconf: DirConf, cfg: RunConfig, synctime: Optional[float]) -> bool:
+  if dirconf.backup_only or not cfg.sync: # or cfg.dryrun:
     return True
 
-  return check_for_files_not_on_both(dirconf["local"], dirconf["remote"], cfg, tstamp_file)
+  return check_for_files_not_on_both(dirconf.name, dirconf.local, dirconf.remote, cfg, synctime)
+
+
+# update path's mtime, creating it if needed
+def touch(path: str) -> None:
+  try:
+    os.utime(path, None)
+  except FileNotFoundError:
+    open(path, "wb").close()
+
+
+# None if path doesn't exist
+def file_mtime(path: str) -> Optional[float]:
+  try:
+    return os.stat(path).st_mtime
+  except FileNotFoundError:
+    return None
+
+
+def sync_dir(dirtosync: str, cfg: RunConfig) -> None:
+  # each worker gets its own config: output is buffered per dir, and
+  # handle_only_remote_files may switch cfg.sync off for this dir only
+  cfg = copy.copy(cfg)
+  cfg.out = io.StringIO()
+  try:
+    if stop_syncing.is_set():
+      return
+    dirconf: DirConf = SYNCDIRS[dirtosync]
+    log(f"sync \x1b[1;33m{dirtosync} on {dirconf.repo}\x1b[0m: ", out=cfg.out)
+    tstamp_file: str = f"{os.environ['HOME']}/tmp/var/gdsync.{dirtosync}.tstamp"
+    # time of the last sync of this dir, None if it has never been synced
+    synctime: Optional[float] = file_mtime(tstamp_file)
+    if conflicts_check_is_ok(dirconf, cfg, synctime):
+      if stop_syncing.is_set():
+        return
+      if not cfg.dryrun:
+        touch(tstamp_file)
+
+      run_rclone(dirconf.local, dirconf.remote, True, cfg)
+      flush_output(cfg)
+      if not dirconf.backup_only:
+        if stop_syncing.is_set():
+          return
+        run_rclone(dirconf.remote, dirconf.local, False, cfg)
+        if not cfg.dryrun:
+          update_sync_cache(dirtosync, dirconf.local)
+  except BaseException:
+    stop_syncing.set()
+    raise
+  finally:
+    flush_output(cfg)
 
 
 def run(mode: str, dirs: List[str], cfg: RunConfig):
@@ -301,18 +727,22 @@ def run(mode: str, dirs: List[str], cfg: RunConfig):
   set_envs()
   log(f"\x1b[1;35msync {mode}...\x1b[0m")
 
-  for dirtosync in dirs:
-    dirconf: Dict[str, str] = syncdirs[dirtosync]
-    repo: str = re.sub(":.*", "", dirconf["remote"])
-    log(f"sync \x1b[1;33m{dirtosync} on {repo}\x1b[0m: ")
-    tstamp_file: str = f"{os.environ['HOME']}/tmp/var/gdsync.{dirtosync}.tstamp"
-    if conflicts_check_is_ok(dirconf, cfg, tstamp_file):
-      if not cfg.dryrun:
-        open(tstamp_file, "w").close()
-
-      run_rclone(dirconf["local"], dirconf["remote"], True, cfg)
-      if BACKUP_ONLY not in dirconf:
-        run_rclone(dirconf["remote"], dirconf["local"], False, cfg)
+  with ThreadPoolExecutor(max_workers=max(1, min(len(dirs), MAX_SYNC_WORKERS))) as pool:
+    futures = [pool.submit(sync_dir, dirtosync, cfg) for dirtosync in dirs]
+    try:
+      pending = set(futures)
+      while len(pending) > 0:
+        run_queued_prompt(timeout=0.1)
+        done, pending = wait(pending, timeout=0, return_when=FIRST_EXCEPTION)
+        for fut in futures:
+          if fut in done and fut.exception() is not None:
+            raise fut.exception()
+    except BaseException:
+      # e.g. user answered "q" at a prompt: don't start any more dirs, and
+      # make the running ones stop before their next phase
+      stop_syncing.set()
+      pool.shutdown(cancel_futures=True)
+      raise
 
   log("\x1b[1;35mdone.\x1b[0m")
 
@@ -324,6 +754,16 @@ parser.add_argument("-d", "--dirs", nargs="*")
 parser.add_argument("-n", "--dryrun", action="store_true")
 parser.add_argument("-c", "--copy", help="copy mode: copy instead of syncing - disables deleting", action="store_true")
 parser.add_argument("-v", "--verbose", help="show rclone commands run", action="store_true")
+parser.add_argument(
+  "--tune",
+  help="pass concurrency/buffering flags to rclone (disable for constrained backends)",
+  action=argparse.BooleanOptionalAction,
+  default=True,
+)
+parser.add_argument("--transfers", help="rclone --transfers when tuning", type=int, default=16)
+parser.add_argument("--checkers", help="rclone --checkers when tuning", type=int, default=32)
+parser.add_argument("--buffer-size", help="rclone --buffer-size when tuning", default="16M")
+parser.add_argument("--drive-chunk-size", help="rclone --drive-chunk-size for gdrive when tuning", default="64M")
 parser.add_argument("modes", default=None, nargs="*", metavar="mode", help="specify mode, which implies to run associated sync dirs")
 args = parser.parse_args()
 
@@ -331,13 +771,16 @@ if args.list:
   for mode in modes:
     print(f"{(mode+':').ljust(15)}{' '.join(modes[mode])}", flush=True)
 elif args.info:
-  print(f" local: {syncdirs[args.info]['local']}", flush=True)
-  print(f"remote: {syncdirs[args.info]['remote']}", flush=True)
+  print(f" local: {SYNCDIRS[args.info].local}", flush=True)
+  print(f"remote: {SYNCDIRS[args.info].remote}", flush=True)
 elif is_already_running(args.modes, args.dirs):
   print(f"already running: mypid={os.getpid()}", flush=True)
   sys.exit(1)
 else:
-  run_cfg = RunConfig(args.dryrun, not args.copy, args.verbose)
+  tuning: Optional[RcloneTuning] = None
+  if args.tune:
+    tuning = RcloneTuning(args.transfers, args.checkers, args.buffer_size, args.drive_chunk_size)
+  run_cfg = RunConfig(args.dryrun, not args.copy, args.verbose, tuning)
   if args.modes and len(args.modes) > 0:
     modes2run: List[str]
     if len(args.modes) == 1 and args.modes[0] == "all":
@@ -345,8 +788,9 @@ else:
     else:
       modes2run = args.modes
 
-    for mode in modes2run:
-      run(mode, modes[mode], run_cfg)
+    # all modes share one worker pool; a dir listed in several modes is synced once
+    dirs2run: List[str] = list(dict.fromkeys(d for mode in modes2run for d in modes[mode]))
+    run(" ".join(modes2run), dirs2run, run_cfg)
 
   elif args.dirs and len(args.dirs) > 0:
     run("", args.dirs, run_cfg)